@@ -1,14 +1,100 @@
+from collections.abc import AsyncIterator
+from contextvars import ContextVar
 from dataclasses import dataclass
 from os import getenv
-from typing import Any, Dict, List, Optional, Type, Union
+from time import monotonic
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, Type, Union
 
-from pydantic import BaseModel
-from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from openai import APIConnectionError, APIStatusError
 
 from agno.exceptions import ModelAuthenticationError, ModelProviderError
+from agno.models.message import Message
 from agno.models.openai.like import OpenAILike
 from agno.models.response import ModelResponse
 from agno.run.agent import RunOutput
+from agno.run.team import TeamRunOutput
+from agno.utils.log import log_debug
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion, ChatCompletionChunk
+    from pydantic import BaseModel
+
+# Shared read-only mapping returned for objects without extra fields
+_EMPTY_EXTRA: Mapping[str, Any] = MappingProxyType({})
+
+# Whether the request being made in the current context carried fallback models.
+# Concurrent runs share one model instance, so this is tracked per context, not on the instance.
+_fallbacks_sent: ContextVar[bool] = ContextVar("openrouter_fallbacks_sent", default=False)
+
+# Dump function to use for each metadata object type, resolved once per type
+_DUMP_DISPATCH: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+
+
+def _dump_fallback(obj: Any) -> Dict[str, Any]:
+    try:
+        data = dict(obj)
+    except Exception:
+        return {}
+
+    extra = getattr(obj, "__pydantic_extra__", None)
+    if extra:
+        data.update(extra)
+    return data
+
+
+def _dump(obj: Any) -> Dict[str, Any]:
+    """Dump a usage or choice object to a dict, including any extra fields."""
+    obj_type = type(obj)
+    dump_fn = _DUMP_DISPATCH.get(obj_type)
+    if dump_fn is None:
+        # model_dump() already includes extra fields (e.g. OpenRouter's cost)
+        dump_fn = getattr(obj_type, "model_dump", None) or _dump_fallback
+        _DUMP_DISPATCH[obj_type] = dump_fn
+    return dump_fn(obj)
+
+
+class FallbackCircuitBreaker:
+    """Tracks primary model failures to decide when fallback models should be sent.
+
+    The breaker starts CLOSED, where requests go to the primary model only. After
+    `failure_threshold` consecutive failures it OPENs and requests carry the fallback
+    models. Once `recovery_timeout` seconds have passed it turns HALF_OPEN and requests
+    go to the primary model alone again: a success closes the breaker, a failure re-opens it.
+    Successes of requests that carried fallback models are ignored, as a fallback may have served them.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    __slots__ = ("failure_threshold", "recovery_timeout", "state", "failures", "opened_at")
+
+    def __init__(self, failure_threshold: int = 1, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def use_fallback(self) -> bool:
+        if self.state == self.OPEN and monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+        return self.state == self.OPEN
+
+    def record_success(self, fallbacks_sent: bool) -> None:
+        if fallbacks_sent or self.state == self.OPEN:
+            return
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                log_debug("OpenRouter primary model failing, sending fallback models")
+            self.state = self.OPEN
+            self.opened_at = monotonic()
 
 
 @dataclass
@@ -26,6 +112,11 @@ class OpenRouter(OpenAILike):
         fallback_models (Optional[List[str]]): List of fallback model IDs to use if the primary model
             fails due to rate limits, timeouts, or unavailability. OpenRouter will automatically try
             these models in order. Example: ["anthropic/claude-sonnet-4", "deepseek/deepseek-r1"]
+        fallback_circuit_breaker (bool): Only send `models` after the primary model starts failing with
+            rate limit, server or connection errors, instead of on every request. Defaults to False.
+        fallback_failure_threshold (int): Consecutive primary failures before fallback models are sent. Defaults to 1.
+        fallback_recovery_timeout (float): Seconds to keep sending fallback models before requests go to the
+            primary model alone again. A success then stops sending fallbacks, a failure resumes them. Defaults to 60.
     """
 
     id: str = "gpt-4o"
@@ -36,6 +127,17 @@ class OpenRouter(OpenAILike):
     base_url: str = "https://openrouter.ai/api/v1"
     max_tokens: int = 1024
     models: Optional[List[str]] = None  # Dynamic model routing https://openrouter.ai/docs/features/model-routing
+    fallback_circuit_breaker: bool = False
+    fallback_failure_threshold: int = 1
+    fallback_recovery_timeout: float = 60.0
+
+    def __post_init__(self):
+        super().__post_init__()
+        self._fallback_breaker: Optional[FallbackCircuitBreaker] = (
+            FallbackCircuitBreaker(self.fallback_failure_threshold, self.fallback_recovery_timeout)
+            if self.fallback_circuit_breaker
+            else None
+        )
 
     def _get_client_params(self) -> Dict[str, Any]:
         """
@@ -57,7 +159,7 @@ class OpenRouter(OpenAILike):
 
     def get_request_params(
         self,
-        response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
         tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
         run_response: Optional[RunOutput] = None,
@@ -73,78 +175,167 @@ class OpenRouter(OpenAILike):
             response_format=response_format, tools=tools, tool_choice=tool_choice, run_response=run_response
         )
 
-        # Add fallback models to extra_body if specified
-        if self.models:
-            # Get existing extra_body or create new dict
-            extra_body = request_params.get("extra_body") or {}
+        # Add fallback models to extra_body if specified, without mutating the user's extra_body
+        send_fallbacks = bool(self.models) and (self._fallback_breaker is None or self._fallback_breaker.use_fallback())
+        _fallbacks_sent.set(send_fallbacks)
+        if send_fallbacks:
+            request_params["extra_body"] = {**(request_params.get("extra_body") or {}), "models": self.models}
+
+        return request_params
 
-            # Merge fallback models into extra_body
-            extra_body["models"] = self.models
+    def _record_primary_result(self, error: Optional[ModelProviderError] = None) -> None:
+        if self._fallback_breaker is None:
+            return
+        if error is None:
+            self._fallback_breaker.record_success(fallbacks_sent=_fallbacks_sent.get())
+            return
 
-            # Update request params
-            request_params["extra_body"] = extra_body
+        # OpenAIChat wraps every exception in a ModelProviderError. Only count errors reported by the API,
+        # not local ones from message formatting, client setup or response parsing.
+        cause = error.__cause__
+        if isinstance(cause, APIConnectionError) or (
+            isinstance(cause, APIStatusError) and (cause.status_code == 429 or cause.status_code >= 500)
+        ):
+            self._fallback_breaker.record_failure()
 
-        return request_params
+    def invoke(
+        self,
+        messages: List[Message],
+        assistant_message: Message,
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        run_response: Optional[Union[RunOutput, TeamRunOutput]] = None,
+        compress_tool_results: bool = False,
+    ) -> ModelResponse:
+        try:
+            model_response = super().invoke(
+                messages=messages,
+                assistant_message=assistant_message,
+                response_format=response_format,
+                tools=tools,
+                tool_choice=tool_choice,
+                run_response=run_response,
+                compress_tool_results=compress_tool_results,
+            )
+        except ModelProviderError as e:
+            self._record_primary_result(e)
+            raise
+        self._record_primary_result()
+        return model_response
+
+    async def ainvoke(
+        self,
+        messages: List[Message],
+        assistant_message: Message,
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        run_response: Optional[Union[RunOutput, TeamRunOutput]] = None,
+        compress_tool_results: bool = False,
+    ) -> ModelResponse:
+        try:
+            model_response = await super().ainvoke(
+                messages=messages,
+                assistant_message=assistant_message,
+                response_format=response_format,
+                tools=tools,
+                tool_choice=tool_choice,
+                run_response=run_response,
+                compress_tool_results=compress_tool_results,
+            )
+        except ModelProviderError as e:
+            self._record_primary_result(e)
+            raise
+        self._record_primary_result()
+        return model_response
+
+    def invoke_stream(
+        self,
+        messages: List[Message],
+        assistant_message: Message,
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        run_response: Optional[Union[RunOutput, TeamRunOutput]] = None,
+        compress_tool_results: bool = False,
+    ) -> Iterator[ModelResponse]:
+        try:
+            yield from super().invoke_stream(
+                messages=messages,
+                assistant_message=assistant_message,
+                response_format=response_format,
+                tools=tools,
+                tool_choice=tool_choice,
+                run_response=run_response,
+                compress_tool_results=compress_tool_results,
+            )
+        except ModelProviderError as e:
+            self._record_primary_result(e)
+            raise
+        self._record_primary_result()
+
+    async def ainvoke_stream(
+        self,
+        messages: List[Message],
+        assistant_message: Message,
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[Union[str, Dict[str, Any]]] = None,
+        run_response: Optional[Union[RunOutput, TeamRunOutput]] = None,
+        compress_tool_results: bool = False,
+    ) -> AsyncIterator[ModelResponse]:
+        try:
+            async for model_response in super().ainvoke_stream(
+                messages=messages,
+                assistant_message=assistant_message,
+                response_format=response_format,
+                tools=tools,
+                tool_choice=tool_choice,
+                run_response=run_response,
+                compress_tool_results=compress_tool_results,
+            ):
+                yield model_response
+        except ModelProviderError as e:
+            self._record_primary_result(e)
+            raise
+        self._record_primary_result()
 
     @staticmethod
-    def _get_model_extra(data: Any) -> Dict[str, Any]:
-        extra = getattr(data, "model_extra", None)
-        return extra if isinstance(extra, dict) else {}
+    def _get_model_extra(data: Any) -> Mapping[str, Any]:
+        return getattr(data, "__pydantic_extra__", None) or _EMPTY_EXTRA
 
-    @classmethod
-    def _get_usage_metadata(cls, usage: Any) -> Dict[str, Any]:
+    @staticmethod
+    def _get_usage_metadata(usage: Any) -> Dict[str, Any]:
         if usage is None:
             return {}
+        return _dump(usage)
 
-        usage_data: Dict[str, Any] = {}
-        try:
-            usage_data = usage.model_dump()
-        except Exception:
-            try:
-                usage_data = dict(usage)
-            except Exception:
-                usage_data = {}
-
-        usage_extra = cls._get_model_extra(usage)
-        if usage_extra:
-            usage_data.update(usage_extra)
-        return usage_data
-
-    @classmethod
-    def _get_choice_metadata(cls, choice: Any) -> Dict[str, Any]:
-        choice_data: Dict[str, Any] = {}
-        try:
-            choice_data = choice.model_dump()
-        except Exception:
-            try:
-                choice_data = dict(choice)
-            except Exception:
-                choice_data = {}
-
-        choice_extra = cls._get_model_extra(choice)
-        if choice_extra:
-            choice_data.update(choice_extra)
-        return choice_data
+    @staticmethod
+    def _get_choice_metadata(choice: Any) -> Dict[str, Any]:
+        return _dump(choice)
 
     def _apply_openrouter_metadata(
         self,
         model_response: ModelResponse,
-        response: Union[ChatCompletion, ChatCompletionChunk],
+        response: Union["ChatCompletion", "ChatCompletionChunk"],
         *,
         include_choices: bool = True,
     ) -> None:
-        if model_response.provider_data is None:
-            model_response.provider_data = {}
-
-        provider_data = model_response.provider_data
+        # Collect metadata locally so provider_data is only allocated when there is something to add
+        provider_data: Dict[str, Any] = {}
         response_extra = self._get_model_extra(response)
 
-        if getattr(response, "model", None):
-            provider_data["model"] = response.model
-        if getattr(response, "created", None):
-            provider_data["created"] = response.created
-        if getattr(response, "object", None):
-            provider_data["object"] = response.object
+        # Read each field once instead of a getattr() check followed by a second attribute read
+        model = getattr(response, "model", None)
+        if model:
+            provider_data["model"] = model
+        created = getattr(response, "created", None)
+        if created:
+            provider_data["created"] = created
+        response_object = getattr(response, "object", None)
+        if response_object:
+            provider_data["object"] = response_object
         if "provider" in response_extra:
             provider_data["provider"] = response_extra["provider"]
 
@@ -156,21 +347,30 @@ class OpenRouter(OpenAILike):
                 if total_cost is not None:
                     model_response.response_usage.cost = total_cost
 
-        if include_choices and getattr(response, "choices", None):
-            choice_extra = self._get_model_extra(response.choices[0])
-            finish_reason = getattr(response.choices[0], "finish_reason", None) or choice_extra.get("finish_reason")
+        choices = getattr(response, "choices", None)
+        if include_choices and choices:
+            first_choice = choices[0]
+            choice_extra = self._get_model_extra(first_choice)
+            finish_reason = getattr(first_choice, "finish_reason", None) or choice_extra.get("finish_reason")
             native_finish_reason = choice_extra.get("native_finish_reason")
             if finish_reason is not None:
                 provider_data["finish_reason"] = finish_reason
             if native_finish_reason is not None:
                 provider_data["native_finish_reason"] = native_finish_reason
 
+        if not provider_data:
+            return
+        if model_response.provider_data is None:
+            model_response.provider_data = provider_data
+        else:
+            model_response.provider_data.update(provider_data)
+
     def _parse_provider_response(
         self,
-        response: ChatCompletion,
-        response_format: Optional[Union[Dict, Type[BaseModel]]] = None,
+        response: "ChatCompletion",
+        response_format: Optional[Union[Dict, Type["BaseModel"]]] = None,
     ) -> ModelResponse:
-        if response.choices is None or len(response.choices) == 0:
+        if not response.choices:
             raise ModelProviderError(
                 message="Empty response from OpenRouter",
                 model_name=self.name,
@@ -180,7 +380,10 @@ class OpenRouter(OpenAILike):
         self._apply_openrouter_metadata(model_response, response)
         return model_response
 
-    def _parse_provider_response_delta(self, response_delta: ChatCompletionChunk) -> ModelResponse:
+    def _parse_provider_response_delta(self, response_delta: "ChatCompletionChunk") -> ModelResponse:
         model_response = super()._parse_provider_response_delta(response_delta)
-        self._apply_openrouter_metadata(model_response, response_delta)
+        # Finish reasons only arrive on the final chunk of a stream, so skip the choice pass until then
+        choices = response_delta.choices
+        include_choices = bool(choices) and choices[0].finish_reason is not None
+        self._apply_openrouter_metadata(model_response, response_delta, include_choices=include_choices)
         return model_response
@@ -0,0 +1,329 @@
+from contextvars import copy_context
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from openai import BadRequestError, RateLimitError
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from agno.exceptions import ModelAuthenticationError, ModelProviderError
+from agno.models.message import Message
+from agno.models.openrouter import OpenRouter
+from agno.models.openrouter.openrouter import FallbackCircuitBreaker
+
+
+def _chat_completion(**overrides) -> ChatCompletion:
+    data = {
+        "id": "gen-1",
+        "object": "chat.completion",
+        "created": 1700000000,
+        "model": "openai/gpt-4o",
+        "provider": "OpenAI",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "Hello"},
+                "finish_reason": "stop",
+                "native_finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5, "total_cost": 0.25},
+    }
+    data.update(overrides)
+    return ChatCompletion.model_validate(data)
+
+
+def _chat_completion_chunk(**overrides) -> ChatCompletionChunk:
+    data = {
+        "id": "gen-1",
+        "object": "chat.completion.chunk",
+        "created": 1700000000,
+        "model": "openai/gpt-4o",
+        "provider": "OpenAI",
+        "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hel"}, "finish_reason": None}],
+    }
+    data.update(overrides)
+    return ChatCompletionChunk.model_validate(data)
+
+
+def test_usage_metadata_includes_extra_fields():
+    usage = CompletionUsage.model_validate(
+        {"prompt_tokens": 1, "completion_tokens": 2, "total_tokens": 3, "cost": 0.5, "is_byok": False}
+    )
+
+    usage_data = OpenRouter._get_usage_metadata(usage)
+
+    assert usage_data["total_tokens"] == 3
+    assert usage_data["cost"] == 0.5
+    assert usage_data["is_byok"] is False
+
+
+def test_usage_metadata_handles_missing_usage():
+    assert OpenRouter._get_usage_metadata(None) == {}
+
+
+def test_parse_provider_response_applies_openrouter_metadata():
+    model = OpenRouter(id="openai/gpt-4o", api_key="test")
+
+    model_response = model._parse_provider_response(_chat_completion())
+
+    assert model_response.content == "Hello"
+    provider_data = model_response.provider_data
+    assert provider_data is not None
+    assert provider_data["id"] == "gen-1"
+    assert provider_data["model"] == "openai/gpt-4o"
+    assert provider_data["created"] == 1700000000
+    assert provider_data["object"] == "chat.completion"
+    assert provider_data["provider"] == "OpenAI"
+    assert provider_data["usage"]["total_cost"] == 0.25
+    assert provider_data["finish_reason"] == "stop"
+    assert provider_data["native_finish_reason"] == "stop"
+    assert model_response.response_usage is not None
+    assert model_response.response_usage.cost == 0.25
+
+
+def test_parse_provider_response_delta_applies_finish_reason():
+    model = OpenRouter(id="openai/gpt-4o", api_key="test")
+
+    chunk = _chat_completion_chunk(
+        choices=[
+            {
+                "index": 0,
+                "delta": {"content": "lo"},
+                "finish_reason": "length",
+                "native_finish_reason": "max_tokens",
+            }
+        ]
+    )
+    model_response = model._parse_provider_response_delta(chunk)
+
+    assert model_response.content == "lo"
+    assert model_response.provider_data is not None
+    assert model_response.provider_data["finish_reason"] == "length"
+    assert model_response.provider_data["native_finish_reason"] == "max_tokens"
+
+
+def test_parse_provider_response_delta_skips_finish_reason_mid_stream():
+    model = OpenRouter(id="openai/gpt-4o", api_key="test")
+
+    model_response = model._parse_provider_response_delta(_chat_completion_chunk())
+
+    assert model_response.provider_data is not None
+    assert model_response.provider_data["model"] == "openai/gpt-4o"
+    assert "finish_reason" not in model_response.provider_data
+
+
+def test_model_extra_for_objects_without_extras_is_read_only():
+    extra = OpenRouter._get_model_extra(object())
+
+    assert extra == {}
+    with pytest.raises(TypeError):
+        extra["provider"] = "OpenAI"  # type: ignore[index]
+
+
+def test_request_params_include_fallback_models():
+    model = OpenRouter(
+        id="openai/gpt-4o",
+        api_key="test",
+        models=["anthropic/claude-sonnet-4", "deepseek/deepseek-r1"],
+        extra_body={"transforms": ["middle-out"]},
+    )
+
+    request_params = model.get_request_params()
+
+    assert request_params["extra_body"] == {
+        "transforms": ["middle-out"],
+        "models": ["anthropic/claude-sonnet-4", "deepseek/deepseek-r1"],
+    }
+    # The user's extra_body is left untouched
+    assert model.extra_body == {"transforms": ["middle-out"]}
+
+
+def test_request_params_follow_reassigned_fallback_models():
+    model = OpenRouter(id="openai/gpt-4o", api_key="test", models=["anthropic/claude-sonnet-4"])
+
+    model.models = ["deepseek/deepseek-r1"]
+
+    assert model.get_request_params()["extra_body"] == {"models": ["deepseek/deepseek-r1"]}
+
+
+def test_request_params_without_fallback_models():
+    model = OpenRouter(id="openai/gpt-4o", api_key="test")
+
+    assert "extra_body" not in model.get_request_params()
+
+
+def test_choice_metadata_falls_back_to_mapping():
+    assert OpenRouter._get_choice_metadata({"index": 0, "finish_reason": "stop"}) == {
+        "index": 0,
+        "finish_reason": "stop",
+    }
+    assert OpenRouter._get_choice_metadata(object()) == {}
+
+
+def test_parse_provider_response_delta_copies_response_fields_on_every_chunk():
+    # Agent and Team replace run-level provider data with each event's provider_data,
+    # so every chunk has to carry the model and provider that served the stream
+    model = OpenRouter(id="openai/gpt-4o", api_key="test")
+
+    first = model._parse_provider_response_delta(_chat_completion_chunk())
+    middle = model._parse_provider_response_delta(
+        _chat_completion_chunk(choices=[{"index": 0, "delta": {"content": "lo"}, "finish_reason": None}])
+    )
+    last = model._parse_provider_response_delta(
+        _chat_completion_chunk(
+            choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            usage={"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5},
+        )
+    )
+
+    for model_response in (first, middle, last):
+        assert model_response.provider_data is not None
+        assert model_response.provider_data["model"] == "openai/gpt-4o"
+        assert model_response.provider_data["created"] == 1700000000
+        assert model_response.provider_data["object"] == "chat.completion.chunk"
+        assert model_response.provider_data["provider"] == "OpenAI"
+    assert "finish_reason" not in middle.provider_data  # type: ignore[operator]
+    assert last.provider_data["finish_reason"] == "stop"  # type: ignore[index]
+    assert last.provider_data["usage"]["total_tokens"] == 5  # type: ignore[index]
+
+
+def _api_error(error_cls, status_code: int, message: str):
+    request = httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions")
+    response = httpx.Response(status_code, request=request, json={"error": {"message": message}})
+    return error_cls(message, response=response, body=None)
+
+
+def _breaker_model() -> OpenRouter:
+    return OpenRouter(
+        id="openai/gpt-4o",
+        api_key="test",
+        models=["anthropic/claude-sonnet-4"],
+        fallback_circuit_breaker=True,
+    )
+
+
+def _invoke(model: OpenRouter, client: MagicMock) -> None:
+    with patch.object(OpenRouter, "get_client", return_value=client):
+        model.invoke(messages=[Message(role="user", content="Hi")], assistant_message=Message(role="assistant"))
+
+
+def test_circuit_breaker_sends_fallback_models_only_after_primary_failure():
+    model = _breaker_model()
+    assert "extra_body" not in model.get_request_params()
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = _api_error(RateLimitError, 429, "Rate limited")
+    with pytest.raises(ModelProviderError):
+        _invoke(model, client)
+
+    assert model.get_request_params()["extra_body"] == {"models": ["anthropic/claude-sonnet-4"]}
+
+
+def test_circuit_breaker_ignores_client_errors():
+    model = _breaker_model()
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = _api_error(BadRequestError, 400, "Bad request")
+    with pytest.raises(ModelProviderError):
+        _invoke(model, client)
+
+    assert "extra_body" not in model.get_request_params()
+
+
+def test_circuit_breaker_ignores_local_errors():
+    model = _breaker_model()
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = ValueError("local bug")
+    with pytest.raises(ModelProviderError):
+        _invoke(model, client)
+
+    assert model._fallback_breaker is not None
+    assert model._fallback_breaker.state == FallbackCircuitBreaker.CLOSED
+    assert "extra_body" not in model.get_request_params()
+
+
+def test_circuit_breaker_ignores_empty_responses():
+    model = _breaker_model()
+
+    client = MagicMock()
+    client.chat.completions.create.return_value = _chat_completion(choices=[])
+    with pytest.raises(ModelProviderError):
+        _invoke(model, client)
+
+    assert "extra_body" not in model.get_request_params()
+
+
+def test_circuit_breaker_ignores_success_of_request_sent_with_fallbacks():
+    model = _breaker_model()
+    breaker = model._fallback_breaker
+    assert breaker is not None
+    clock = [100.0]
+
+    def create(**kwargs):
+        # While this request (sent with fallbacks) is in flight, the recovery timeout passes and a
+        # concurrent request moves the breaker to HALF_OPEN
+        assert kwargs["extra_body"] == {"models": ["anthropic/claude-sonnet-4"]}
+        clock[0] += 60
+        assert "extra_body" not in copy_context().run(model.get_request_params)
+        return _chat_completion()
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    with patch("agno.models.openrouter.openrouter.monotonic", side_effect=lambda: clock[0]):
+        breaker.record_failure()
+        _invoke(model, client)
+
+    assert breaker.state == FallbackCircuitBreaker.HALF_OPEN
+
+
+def test_circuit_breaker_closes_after_recovery_timeout_and_success():
+    breaker = FallbackCircuitBreaker(failure_threshold=2, recovery_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.use_fallback() is False
+
+    with patch("agno.models.openrouter.openrouter.monotonic", return_value=100.0):
+        breaker.record_failure()
+    with patch("agno.models.openrouter.openrouter.monotonic", return_value=110.0):
+        assert breaker.use_fallback() is True
+        breaker.record_success(fallbacks_sent=True)
+        assert breaker.state == FallbackCircuitBreaker.OPEN
+    with patch("agno.models.openrouter.openrouter.monotonic", return_value=130.0):
+        # After the recovery timeout the primary model is tried alone
+        assert breaker.use_fallback() is False
+        assert breaker.state == FallbackCircuitBreaker.HALF_OPEN
+
+    breaker.record_success(fallbacks_sent=False)
+    assert breaker.state == FallbackCircuitBreaker.CLOSED
+    assert breaker.use_fallback() is False
+
+
+def test_circuit_breaker_reopens_on_failure_in_half_open():
+    breaker = FallbackCircuitBreaker(failure_threshold=1, recovery_timeout=30)
+
+    with patch("agno.models.openrouter.openrouter.monotonic", return_value=100.0):
+        breaker.record_failure()
+    with patch("agno.models.openrouter.openrouter.monotonic", return_value=130.0):
+        assert breaker.use_fallback() is False
+        breaker.record_failure()
+        assert breaker.use_fallback() is True
+        assert breaker.state == FallbackCircuitBreaker.OPEN
+
+
+def test_api_key_read_from_env_set_after_init(monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    model = OpenRouter(id="openai/gpt-4o")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "late")
+
+    assert model._get_client_params()["api_key"] == "late"
+
+
+def test_missing_api_key_raises_on_client_params(monkeypatch):
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    model = OpenRouter(id="openai/gpt-4o")
+
+    with pytest.raises(ModelAuthenticationError):
+        model._get_client_params()